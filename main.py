@@ -20,30 +20,48 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import requests
+import aiohttp
+import aiofiles
+import aiofiles.os
 import csv
 import io
 import asyncio
+import hashlib
 import logging
-import os
+import operator
 import json
 import subprocess
-import re
-from typing import List, Dict, Optional, Set, Tuple, Any
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Set, Tuple, Any, Literal, Iterable, Iterator
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
 from aiogram import Bot, Dispatcher, types, F
 from aiogram.filters import Command
 from aiogram.client.default import DefaultBotProperties
 
 # ====== CONFIGURATION ======
-BOT_TOKEN: str = open('bot_token.txt').read().strip()
+BOT_TOKEN: str = Path('bot_token.txt').read_text(encoding='utf-8').strip()
 SPREADSHEET_ID: str = "1PlQVDjbfnTrUBmgltN2JwDnq3ZUjs8l4ei_MkaGzL1A"
 SHEET_GIDS: List[str] = ["730603969", "928911897"]
 FETCH_INTERVAL: int = 600
+MAX_FETCH_INTERVAL: int = 1800
 ENTRIES_FILE: str = "entries.json"
+TERMINAL_FILE: str = "terminal.json"
 IMAGE_PATH: str = "/home/yokhor/Pictures/moth.png"
 PERIODIC_NOTIFY_INTERVAL: int = 30
+MONITORED_COLUMNS: List[str] = ["Метка времени", "ФИО", "Задание", "Проверяющий", "Оценка"]
 # ===========================
 
+RowIndex = Dict[Tuple[str, str, str], Dict[str, str]]
+
 logging.basicConfig(
     level=logging.INFO,
     format="[%(asctime)s] %(levelname)s:%(name)s: %(message)s"
@@ -57,17 +75,30 @@ bot: Bot = Bot(
 dp: Dispatcher = Dispatcher()
 monitoring_task: Optional[asyncio.Task] = None
 notify_task: Optional[asyncio.Task] = None
+http_session: Optional[aiohttp.ClientSession] = None
 waiting_for_entry: Set[int] = set()
 waiting_for_delete: Set[int] = set()
 notified_on_review: Set[str] = set()
+_terminal: Set[str] = set()
+_sheet_cache: Dict[Tuple[str, str], Tuple[float, RowIndex]] = {}
+_etag: Dict[Tuple[str, str], str] = {}
+_last_modified: Dict[Tuple[str, str], str] = {}
+_last_parsed: Dict[Tuple[str, str], RowIndex] = {}
+_body_hash: Dict[Tuple[str, str], bytes] = {}
+_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+_entries_cache: List[Dict[str, str]] = []
+_entries_key_set: Set[Tuple[str, str, str]] = set()
+_entries_mtime: Optional[float] = None
+_entries_lock = asyncio.Lock()
+_entries_changed = asyncio.Event()
+_ESCAPE_TABLE = str.maketrans({c: '\\' + c for c in '_*[]()~`>#+-=|{}.!\\'})
 
 
 def escape_md(text: str) -> str:
     """
     Escape special characters for MarkdownV2 Telegram format.
     """
-    escape_chars = r'_*\[\]()~`>#+-=|{}.!'
-    return re.sub(r'([%s])' % re.escape(escape_chars), r'\\\1', text)
+    return text.translate(_ESCAPE_TABLE)
 
 
 def monospace_block(text: str) -> str:
@@ -78,37 +109,161 @@ def monospace_block(text: str) -> str:
     return f"```\n{text}\n```"
 
 
-def get_gsheet_csv(spreadsheet_id: str, sheet_gid: str) -> List[Dict[str, str]]:
+def parse_csv(content: bytes) -> Iterable[Tuple[str, ...]]:
     """
-    Fetch CSV data from Google Sheets and return as list of dictionaries.
+    Parse CSV export into tuples of monitored column values, in MONITORED_COLUMNS order.
+    Uses native pyarrow parser when available.
     """
+    if not content.strip():
+        return iter(())
+    if pa:
+        table = pa_csv.read_csv(
+            pa.BufferReader(content),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=MONITORED_COLUMNS,
+                include_missing_columns=True,
+                column_types={c: pa.string() for c in MONITORED_COLUMNS},
+            )
+        )
+        # Missing columns come back as nulls, the CSV fallback yields "" there
+        columns = [table.column(c).fill_null("").to_pylist() for c in MONITORED_COLUMNS]
+        return zip(*columns)
+    reader = csv.reader(io.StringIO(content.decode('utf-8')))
+    header = next(reader, [])
+    width = len(header)
+    # Missing columns point one past the header, rows are padded to reach it
+    getter = operator.itemgetter(*(header.index(c) if c in header else width for c in MONITORED_COLUMNS))
+    padding = [""] * (width + 1)
+
+    def rows() -> Iterator[Tuple[str, ...]]:
+        for row in reader:
+            if len(row) <= width:
+                row += padding[len(row):]
+            yield getter(row)
+    return rows()
+
+
+def index_rows(rows: Iterable[Tuple[str, ...]]) -> RowIndex:
+    """
+    Build lookup index of rows keyed by (timestamp, name, task).
+    The first row wins on duplicate keys.
+    """
+    index: RowIndex = {}
+    for values in rows:
+        # MONITORED_COLUMNS starts with timestamp, name and task
+        key = values[:3]
+        if key not in index:
+            index[key] = dict(zip(MONITORED_COLUMNS, values))
+    return index
+
+
+def _parse_and_index(content: bytes) -> RowIndex:
+    """
+    Parse CSV export and build lookup index in one go, meant to run off the event loop.
+    """
+    return index_rows(parse_csv(content))
+
+
+async def get_gsheet_csv(
+        session: aiohttp.ClientSession,
+        spreadsheet_id: str,
+        sheet_gid: str,
+        use_cache: bool = True
+) -> RowIndex:
+    """
+    Fetch CSV data from Google Sheets and return rows indexed by (timestamp, name, task).
+    Results younger than FETCH_INTERVAL are served from memory,
+    concurrent calls for the same sheet share a single request.
+    """
+    key = (spreadsheet_id, sheet_gid)
+    cached = _sheet_cache.get(key)
+    if use_cache and cached and time.monotonic() - cached[0] < FETCH_INTERVAL:
+        return cached[1]
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_sheet(session, spreadsheet_id, sheet_gid))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so that a cancelled caller does not abort the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_sheet(
+        session: aiohttp.ClientSession,
+        spreadsheet_id: str,
+        sheet_gid: str
+) -> RowIndex:
+    """
+    Download and parse sheet, revalidating previous result with a conditional GET.
+    """
+    key = (spreadsheet_id, sheet_gid)
     url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={sheet_gid}"
-    resp = requests.get(url)
-    resp.raise_for_status()
-    f = io.StringIO(resp.content.decode('utf-8'))
-    return list(csv.DictReader(f))
+    headers = {}
+    if key in _last_parsed:
+        if key in _etag:
+            headers["If-None-Match"] = _etag[key]
+        if key in _last_modified:
+            headers["If-Modified-Since"] = _last_modified[key]
+    async with session.get(url, headers=headers) as resp:
+        resp.raise_for_status()
+        if resp.status == 304:
+            rows = _last_parsed[key]
+            _sheet_cache[key] = (time.monotonic(), rows)
+            return rows
+        content = await resp.read()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+    # Export without validators still often repeats byte-for-byte, skip parsing then
+    body_hash = hashlib.blake2b(content, digest_size=16).digest()
+    if _body_hash.get(key) == body_hash and key in _last_parsed:
+        rows = _last_parsed[key]
+    else:
+        rows = await asyncio.to_thread(_parse_and_index, content)
+        _body_hash[key] = body_hash
+    if etag:
+        _etag[key] = etag
+    if last_modified:
+        _last_modified[key] = last_modified
+    _last_parsed[key] = rows
+    _sheet_cache[key] = (time.monotonic(), rows)
+    return rows
+
+
+async def fetch_all_sheets(session: aiohttp.ClientSession, use_cache: bool = True) -> List[Any]:
+    """
+    Fetch all sheets concurrently.
+    Returns list aligned with SHEET_GIDS, holding either row index or the raised exception.
+    """
+    return await asyncio.gather(
+        *(get_gsheet_csv(session, SPREADSHEET_ID, gid, use_cache) for gid in SHEET_GIDS),
+        return_exceptions=True
+    )
 
 
 def find_entry(
-        data: List[Dict[str, str]],
+        index: RowIndex,
         timestamp: str,
         name: str,
         task: str
 ) -> Optional[Dict[str, str]]:
     """
-    Find specific entry in the data by timestamp, name and task.
+    Find specific entry in the indexed data by timestamp, name and task.
+    """
+    return index.get((timestamp, name, task))
+
+
+def classify_row(row: Dict[str, str]) -> Literal["exists", "on_review", "checked"]:
+    """
+    Classify sheet row by its review state.
     """
-    for row in data:
-        if (
-                row.get("Метка времени") == timestamp
-                and row.get("ФИО") == name
-                and row.get("Задание") == task
-        ):
-            return row
-    return None
+    grade = row.get("Оценка")
+    reviewer = row.get("Проверяющий")
+    return "checked" if grade else "on_review" if reviewer else "exists"
 
 
-def check_entry_status(
+async def check_entry_status(
+        session: aiohttp.ClientSession,
         timestamp: str,
         name: str,
         task: str
@@ -117,41 +272,152 @@ def check_entry_status(
     Check entry status across all sheets.
     Returns tuple of (status, row_data).
     """
-    for gid in SHEET_GIDS:
-        try:
-            data = get_gsheet_csv(SPREADSHEET_ID, gid)
+    # Cached sheets may predate a fresh submission, so retry a miss with a real fetch
+    for use_cache in (True, False):
+        results = await fetch_all_sheets(session, use_cache)
+        for gid, data in zip(SHEET_GIDS, results):
+            if isinstance(data, Exception):
+                logger.error(f"Error checking entry in GID {gid}: {data}")
+                continue
             row = find_entry(data, timestamp, name, task)
             if row:
-                if row.get("Оценка"):
-                    return "checked", row
-                if row.get("Проверяющий") and not row.get("Оценка"):
-                    return "on_review", row
-                return "exists", row
-        except Exception as e:
-            logger.error(f"Error checking entry in GID {gid}: {e}")
+                return classify_row(row), row
     return "not_found", None
 
 
-def load_entries() -> List[Dict[str, str]]:
+async def _write_atomic(path: str, raw: bytes) -> None:
+    """
+    Write file via temporary file so that readers never see partial content.
+    """
+    tmp_path = f"{path}.tmp"
+    async with aiofiles.open(tmp_path, "wb") as f:
+        await f.write(raw)
+    await aiofiles.os.replace(tmp_path, path)
+
+
+async def _read_entries() -> List[Dict[str, str]]:
+    """
+    Load entries from JSON file, re-reading it only when its mtime changes.
+    Caller must hold _entries_lock.
+    """
+    global _entries_cache, _entries_key_set, _entries_mtime
+    try:
+        mtime = (await aiofiles.os.stat(ENTRIES_FILE)).st_mtime
+    except FileNotFoundError:
+        _entries_cache, _entries_key_set, _entries_mtime = [], set(), None
+        return []
+    if mtime != _entries_mtime:
+        async with aiofiles.open(ENTRIES_FILE, 'rb') as f:
+            raw = await f.read()
+        try:
+            entries = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
+            if not isinstance(entries, list) or not all(
+                    isinstance(e, dict) and all(isinstance(e.get(k), str) for k in ("timestamp", "name", "task"))
+                    for e in entries
+            ):
+                raise ValueError("expected list of entries with timestamp, name and task")
+            _entries_cache = entries
+            _entries_key_set = {(e["timestamp"], e["name"], e["task"]) for e in entries}
+        except Exception as e:
+            logger.error(f"JSON read error: {e}")
+            _entries_cache, _entries_key_set = [], set()
+        _entries_mtime = mtime
+    return list(_entries_cache)
+
+
+async def _write_entries(entries: List[Dict[str, str]]) -> None:
+    """
+    Save entries to compact JSON file.
+    Caller must hold _entries_lock.
+    """
+    global _entries_cache, _entries_key_set, _entries_mtime
+    if orjson:
+        raw = orjson.dumps(entries)
+    else:
+        raw = json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    await _write_atomic(ENTRIES_FILE, raw)
+    mtime = (await aiofiles.os.stat(ENTRIES_FILE)).st_mtime
+    _entries_cache, _entries_mtime = list(entries), mtime
+    _entries_key_set = {(e["timestamp"], e["name"], e["task"]) for e in entries}
+    _entries_changed.set()
+
+
+async def wait_entries_change(timeout: float) -> bool:
+    """
+    Wait until entries are saved or timeout expires.
+    Returns whether entries have changed.
+    """
+    try:
+        await asyncio.wait_for(_entries_changed.wait(), timeout)
+    except asyncio.TimeoutError:
+        return False
+    _entries_changed.clear()
+    return True
+
+
+async def load_entries() -> List[Dict[str, str]]:
     """
     Load entries from JSON file.
     """
-    if os.path.exists(ENTRIES_FILE):
-        with open(ENTRIES_FILE, encoding='utf-8') as f:
+    async with _entries_lock:
+        return await _read_entries()
+
+
+async def add_entry(timestamp: str, name: str, task: str) -> bool:
+    """
+    Add entry unless it is already tracked.
+    Returns whether entry was added.
+    """
+    async with _entries_lock:
+        entries = await _read_entries()
+        if (timestamp, name, task) in _entries_key_set:
+            return False
+        entries.append({
+            "timestamp": timestamp,
+            "name": name,
+            "task": task,
+        })
+        await _write_entries(entries)
+        return True
+
+
+async def remove_entry(timestamp: str, name: str, task: str) -> bool:
+    """
+    Remove tracked entry and forget its checked state.
+    Returns whether entry was found.
+    """
+    key = (timestamp, name, task)
+    async with _entries_lock:
+        entries = await _read_entries()
+        if key not in _entries_key_set:
+            return False
+        await _write_entries([e for e in entries if (e["timestamp"], e["name"], e["task"]) != key])
+    entry_id = "|".join(key)
+    if entry_id in _terminal:
+        _terminal.discard(entry_id)
+        await save_terminal()
+    return True
+
+
+async def load_terminal() -> Set[str]:
+    """
+    Load ids of already checked entries from JSON file.
+    """
+    if await aiofiles.os.path.exists(TERMINAL_FILE):
+        async with aiofiles.open(TERMINAL_FILE, encoding='utf-8') as f:
             try:
-                return json.load(f)
+                return set(json.loads(await f.read()))
             except Exception as e:
                 logger.error(f"JSON read error: {e}")
-                return []
-    return []
+    return set()
 
 
-def save_entries(entries: List[Dict[str, str]]) -> None:
+async def save_terminal() -> None:
     """
-    Save entries to JSON file.
+    Save ids of already checked entries to JSON file.
     """
-    with open(ENTRIES_FILE, "w", encoding='utf-8') as f:
-        json.dump(entries, f, ensure_ascii=False, indent=2)
+    raw = json.dumps(sorted(_terminal), ensure_ascii=False, indent=2).encode('utf-8')
+    await _write_atomic(TERMINAL_FILE, raw)
 
 
 def open_image() -> None:
@@ -168,81 +434,134 @@ def open_image() -> None:
 async def periodic_notify(user_id: int, text: str) -> None:
     """
     Send periodic notifications with configured interval.
+    Expects text already escaped for MarkdownV2.
     """
     while True:
         try:
-            await bot.send_message(user_id, escape_md(text))
+            await bot.send_message(user_id, text, parse_mode="MarkdownV2")
         except Exception as e:
             logger.error(f"Failed to send notification: {e}")
         await asyncio.sleep(PERIODIC_NOTIFY_INTERVAL)
 
 
-async def monitor_gsheet(user_id: int) -> None:
+def build_wanted(entries: List[Dict[str, str]]) -> Dict[Tuple[str, str, str], str]:
+    """
+    Map (timestamp, name, task) of entries still to be monitored to their ids.
+    Checked entries are final and left out.
+    """
+    wanted: Dict[Tuple[str, str, str], str] = {}
+    for entry in entries:
+        key = (entry["timestamp"], entry["name"], entry["task"])
+        entry_id = "|".join(key)
+        if entry_id not in _terminal:
+            wanted[key] = entry_id
+    return wanted
+
+
+async def monitor_gsheet(session: aiohttp.ClientSession, user_id: int) -> None:
     """
     Monitor Google Sheets for entry status changes.
     """
     global notify_task
     notified_on_review.clear()
     logger.info("Monitoring started")
+    wanted: Optional[Dict[Tuple[str, str, str], str]] = None
+    wanted_mtime: Optional[float] = None
+    current_interval = FETCH_INTERVAL
+    _entries_changed.clear()
     while True:
-        entries = load_entries()
-        if not entries:
+        entries = await load_entries()
+        # Rebuild lookup keys only when entries file has changed
+        if wanted is None or wanted_mtime != _entries_mtime:
+            wanted = build_wanted(entries)
+            wanted_mtime = _entries_mtime
+            current_interval = FETCH_INTERVAL
+        if not wanted:
             logger.info("No entries to monitor")
-            await asyncio.sleep(FETCH_INTERVAL)
+            await wait_entries_change(FETCH_INTERVAL)
             continue
-        for gid in SHEET_GIDS:
+        _sheet_cache.clear()
+        results = await fetch_all_sheets(session)
+        # Notifications of one cycle are sent as a single message
+        pending_msgs: List[str] = []
+        new_on_review: List[str] = []
+        checked: Optional[Tuple[str, str, str, str]] = None
+        for gid, data in zip(SHEET_GIDS, results):
             try:
-                data = get_gsheet_csv(SPREADSHEET_ID, gid)
-                for entry in entries:
-                    timestamp, name, task = entry["timestamp"], entry["name"], entry["task"]
-                    row = find_entry(data, timestamp, name, task)
+                if isinstance(data, Exception):
+                    raise data
+                for key, entry_id in wanted.items():
+                    row = data.get(key)
                     if not row:
                         continue
+                    _, name, task = key
+                    status = classify_row(row)
 
                     # On review
-                    if row.get("Проверяющий") and not row.get("Оценка"):
-                        entry_id = f"{timestamp}|{name}|{task}"
+                    if status == "on_review":
                         if entry_id not in notified_on_review:
                             notified_on_review.add(entry_id)
-                            message_text = f"Посылка `{escape_md(task)}` для `{escape_md(name)}` на проверке{escape_md('!')}"
-                            await bot.send_message(
-                                user_id,
-                                message_text,
-                                parse_mode="MarkdownV2"
+                            new_on_review.append(entry_id)
+                            pending_msgs.append(
+                                f"Посылка `{escape_md(task)}` для `{escape_md(name)}` на проверке{escape_md('!')}"
                             )
-                            open_image()
-                            logger.info("Sent 'На проверке' notification and opened image.")
 
                     # Checked
-                    if row.get("Оценка"):
-                        reviewer = row.get("Проверяющий", "Неизвестно")
+                    elif status == "checked":
+                        reviewer = row.get("Проверяющий") or "Неизвестно"
                         grade = row.get("Оценка")
 
-                        message_text = (
+                        pending_msgs.append(
                             f"Посылка `{escape_md(task)}` для `{escape_md(name)}` проверена{escape_md('!')}\n"
                             f"Проверяющий: `{escape_md(reviewer)}`\n"
                             f"Оценка: `{escape_md(str(grade))}`\n\n"
                             f"Мониторинг остановлен{escape_md('.')}"
                         )
-
-                        await bot.send_message(
-                            user_id,
-                            message_text,
-                            parse_mode="MarkdownV2"
-                        )
-                        open_image()
-                        logger.info("Task checked - stopping monitoring and starting periodic notification.")
-                        if monitoring_task:
-                            monitoring_task.cancel()
-                        if notify_task:
-                            notify_task.cancel()
-                        notify_task = asyncio.create_task(periodic_notify(
-                            user_id, f"Посылка '{task}' для {name} проверена! Оценка: {grade}"
-                        ))
-                        return
+                        checked = (entry_id, task, name, str(grade))
+                        break
             except Exception as e:
                 logger.error(f"Error fetching/searching GID {gid}: {e}")
-        await asyncio.sleep(FETCH_INTERVAL)
+            if checked:
+                break
+
+        if pending_msgs:
+            try:
+                await bot.send_message(
+                    user_id,
+                    "\n\n".join(pending_msgs),
+                    parse_mode="MarkdownV2"
+                )
+            except Exception as e:
+                # Leave entries as they were so the next cycle retries them
+                logger.error(f"Failed to send notification: {e}")
+                notified_on_review.difference_update(new_on_review)
+                checked = None
+            else:
+                open_image()
+                logger.info(f"Sent {len(pending_msgs)} notification(s) and opened image.")
+
+        if checked:
+            entry_id, task, name, grade = checked
+            # Mark as final only once the notification went out
+            _terminal.add(entry_id)
+            await save_terminal()
+            logger.info("Task checked - stopping monitoring and starting periodic notification.")
+            if monitoring_task:
+                monitoring_task.cancel()
+            if notify_task:
+                notify_task.cancel()
+            msg = escape_md(f"Посылка '{task}' для {name} проверена! Оценка: {grade}")
+            notify_task = asyncio.create_task(periodic_notify(user_id, msg))
+            return
+
+        # Back off while nothing happens, poll at base rate again after any change
+        if pending_msgs:
+            current_interval = FETCH_INTERVAL
+        else:
+            current_interval = min(current_interval * 2, MAX_FETCH_INTERVAL)
+        # Wake up early when entries are added or removed
+        if await wait_entries_change(current_interval):
+            current_interval = FETCH_INTERVAL
 
 
 @dp.message(Command("start"))
@@ -261,7 +580,7 @@ async def start_monitoring(message: types.Message) -> None:
     global monitoring_task
     user_id = message.from_user.id
     if not monitoring_task or monitoring_task.done():
-        monitoring_task = asyncio.create_task(monitor_gsheet(user_id))
+        monitoring_task = asyncio.create_task(monitor_gsheet(http_session, user_id))
         await message.answer(escape_md("Мониторинг запущен!"))
         logger.info(f"Monitoring started by user {user_id}")
     else:
@@ -305,7 +624,7 @@ async def list_entries(message: types.Message) -> None:
     """
     Handle /listentries command to show all monitored entries.
     """
-    entries = load_entries()
+    entries = await load_entries()
     if not entries:
         await message.answer(escape_md("Нет отслеживаемых посылок."))
         return
@@ -371,7 +690,7 @@ async def delete_entry_command(message: types.Message) -> None:
     """
     Handle /delentry command to delete entry from monitoring.
     """
-    entries = load_entries()
+    entries = await load_entries()
     if not entries:
         await message.answer(escape_md("Нет отслеживаемых посылок для удаления."))
         return
@@ -395,16 +714,7 @@ async def handle_entry_lines(message: types.Message) -> None:
             return
 
         timestamp, name, task = [line.strip() for line in lines]
-        entries = load_entries()
-        entry_to_remove = {
-            "timestamp": timestamp,
-            "name": name,
-            "task": task,
-        }
-
-        if entry_to_remove in entries:
-            entries.remove(entry_to_remove)
-            save_entries(entries)
+        if await remove_entry(timestamp, name, task):
             await message.answer(escape_md("Посылка удалена:"))
             block = monospace_block(f"{timestamp}\n{name}\n{task}")
             await message.answer(block)
@@ -427,32 +737,19 @@ async def handle_entry_lines(message: types.Message) -> None:
         return
     timestamp, name, task = [line.strip() for line in lines]
     await message.answer(escape_md("Проверяю наличие в таблицах..."))
-    loop = asyncio.get_event_loop()
-    status, row = await loop.run_in_executor(
-        None, check_entry_status, timestamp, name, task
-    )
-    entries = load_entries()
-    new_entry = {
-        "timestamp": timestamp,
-        "name": name,
-        "task": task,
-    }
+    status, row = await check_entry_status(http_session, timestamp, name, task)
     if status == "not_found":
         await message.answer(escape_md("Такой посылки нет ни в одной из таблиц. Добавление отменено."))
     elif status == "checked":
         await message.answer(escape_md("Эта посылка уже проверена. Добавление отменено."))
     elif status == "on_review":
         await message.answer(escape_md("Эта посылка уже на проверке и будет добавлена для отслеживания."))
-        if new_entry not in entries:
-            entries.append(new_entry)
-            save_entries(entries)
+        if await add_entry(timestamp, name, task):
             await message.answer(escape_md("Посылка добавлена к мониторингу."))
         else:
             await message.answer(escape_md("Эта посылка уже отслеживается."))
     elif status == "exists":
-        if new_entry not in entries:
-            entries.append(new_entry)
-            save_entries(entries)
+        if await add_entry(timestamp, name, task):
             await message.answer(escape_md("Посылка добавлена к мониторингу."))
         else:
             await message.answer(escape_md("Эта посылка уже отслеживается."))
@@ -463,8 +760,14 @@ async def main() -> None:
     """
     Main function to start the bot.
     """
+    global http_session
+    http_session = aiohttp.ClientSession()
+    _terminal.update(await load_terminal())
     logger.info("Bot started.")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await http_session.close()
 
 
 if __name__ == "__main__":